@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, Union
+
+import orjson
+
+
+DEFAULT_CACHE_PATH = os.path.join(".video_cache", "cache.sqlite3")
+DEFAULT_EXPIRE_SECONDS = 24 * 3600
+
+
+def hash_bytes(data: Union[bytes, memoryview]) -> str:
+    """
+    Hex digest used for content-addressed cache keys.
+
+    BLAKE2b is in the standard library and faster than SHA-256 in software;
+    hashlib reads the buffer in place, so large videos are not copied.
+    """
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+class VideoAnalysisCache:
+    """
+    Small sqlite3-backed key/value store with per-entry expiry.
+
+    Values can be any orjson-serializable object. A new connection is opened
+    per operation, so one instance can be shared across threads.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH) -> None:
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(video_bytes: Union[bytes, memoryview], prompt: str, model_name: str) -> str:
+        """
+        Build the cache key for one (video, prompt, model) analysis.
+        """
+        return f"{hash_bytes(video_bytes)}:{hash_bytes(prompt.encode('utf-8'))}:{model_name}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for `key`, or None if missing or expired.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+        return orjson.loads(value)
+
+    def set(self, key: str, value: Any, expire: Optional[float] = DEFAULT_EXPIRE_SECONDS) -> None:
+        """
+        Store `value` under `key`, expiring after `expire` seconds (None = never).
+        """
+        expires_at = time.time() + expire if expire is not None else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, orjson.dumps(value), expires_at),
+            )
+
+
+__all__ = [
+    "DEFAULT_CACHE_PATH",
+    "DEFAULT_EXPIRE_SECONDS",
+    "hash_bytes",
+    "VideoAnalysisCache",
+]
@@ -1,15 +1,15 @@
 from __future__ import annotations
 
 import argparse
+import mmap
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
 
-from video_analysis_models import AnalysisResult
-from video_llm_integration import (
-    analyze_video_structure,
-    configure_genai,
-    reverse_engineer_scenes,
-)
+from video_preprocessing import preprocess_video_file
+
+if TYPE_CHECKING:
+    from video_analysis_models import AnalysisResult
 
 
 def parse_args() -> argparse.Namespace:
@@ -35,6 +35,14 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Optional subtitle/transcript text file to provide as context.",
     )
+    parser.add_argument(
+        "--preprocess",
+        action="store_true",
+        help=(
+            "Upload a cached, downsampled copy of the video (<=2 fps, <=64 frames, "
+            "<=720px, no audio) instead of the original."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -43,14 +51,41 @@ def load_subtitle_text(path: Optional[str]) -> Optional[str]:
         return None
     if not os.path.exists(path):
         raise FileNotFoundError(f"Subtitle file not found: {path}")
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
-
-
-def demo(video_path: str, api_key: str, target_engine: str, subtitle_file: Optional[str]) -> None:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map an empty file.
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Decode straight from the mapped pages; no intermediate bytes copy.
+            text = str(mm, "utf-8")
+    # Binary mode skips text mode's universal newlines; apply them here so
+    # CRLF/CR subtitle files don't leak "\r" into the prompt.
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def demo(
+    video_path: str,
+    api_key: str,
+    target_engine: str,
+    subtitle_file: Optional[str],
+    preprocess: bool = False,
+) -> None:
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"Video file not found: {video_path}")
 
+    # Imported here so `--help` and argument errors don't pay for the Gemini SDK.
+    from video_llm_integration import (
+        analyze_video_structure,
+        configure_genai,
+        reverse_engineer_scenes,
+    )
+
+    if preprocess:
+        print("Preprocessing video (resampled copy is cached in .frame_cache/)...")
+        video_path = preprocess_video_file(video_path)
+
     # Configure using explicit key if provided, otherwise fall back to env vars.
     configure_genai(api_key=api_key)
 
@@ -78,12 +113,24 @@ Only output a valid JSON object matching this shape:
 }
 """.strip()
 
-    print("Running video analysis (AnalysisResult JSON)...")
-    analysis: AnalysisResult = analyze_video_structure(
-        video_file_path=video_path,
-        system_prompt=analysis_system_prompt,
-    )
+    # Both calls are independent and network-bound, so run them concurrently.
+    print("Running video analysis (AnalysisResult JSON) and reverse-engineering (IR + prompts)...")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        analysis_future = executor.submit(
+            analyze_video_structure,
+            video_file_path=video_path,
+            system_prompt=analysis_system_prompt,
+        )
+        reveng_future = executor.submit(
+            reverse_engineer_scenes,
+            video_file_path=video_path,
+            target_engine=target_engine,
+            subtitle_data=subtitle_text,
+        )
+        analysis: AnalysisResult = analysis_future.result()
+        reveng_result = reveng_future.result()
 
+    print("\nVideo analysis:")
     print(f"- Segments detected: {len(analysis.timeline_segments)}")
     if analysis.timeline_segments:
         first_segment = analysis.timeline_segments[0]
@@ -95,13 +142,7 @@ Only output a valid JSON object matching this shape:
         print(f"- First segment ID: {first_segment.segment_id}")
         print(f"- First segment OCR text (if any): {ocr_text}")
 
-    print("\nRunning reverse-engineering (IR + prompts)...")
-    reveng_result = reverse_engineer_scenes(
-        video_file_path=video_path,
-        target_engine=target_engine,
-        subtitle_data=subtitle_text,
-    )
-
+    print("\nReverse-engineering:")
     try:
         timeline = reveng_result.get("timeline", [])
     except AttributeError:
@@ -123,5 +164,6 @@ if __name__ == "__main__":
         api_key=args.api_key,
         target_engine=args.target_engine,
         subtitle_file=args.subtitle_file,
+        preprocess=args.preprocess,
     )
 
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Optional
+
+import orjson
+
+
+# =============================================================================
+# Helpers for pulling a JSON object out of raw LLM text output.
+#
+# Kept free of I/O and fully annotated so it can be compiled with mypyc for
+# high-QPS batch pipelines:
+#
+#     mypyc model_json.py
+#
+# This drops a `model_json.*.so` next to the source, which Python imports in
+# preference to the .py file; without it the pure-Python module is used.
+# =============================================================================
+
+# Optional leading ``` fence (with language tag), payload, optional closing fence.
+_FENCE_RE = re.compile(r"^\s*```[\w+-]*[^\S\n]*\n?(.*?)(?:```)?\s*$", re.DOTALL)
+
+
+def strip_json_fences(text: str) -> str:
+    """
+    Return model output without surrounding markdown code fences (single regex pass).
+    """
+    match = _FENCE_RE.match(text)
+    if match is None:
+        return text.strip()
+    payload: str = match.group(1)
+    return payload
+
+
+def load_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse model output (after fence stripping) as a JSON object.
+
+    Returns None for anything that is not a JSON object.
+    """
+    try:
+        parsed: Any = orjson.loads(strip_json_fences(text))
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(parsed, dict):
+        return None
+    return parsed
+
+
+def parse_json_from_model_text(text: str) -> Dict[str, Any]:
+    """
+    Best-effort JSON parsing with simple cleanup for common artifacts.
+
+    Anything that is not a JSON object yields `{"error": ..., "raw": ...}`.
+    """
+    parsed = load_json_object(text)
+    if parsed is None:
+        return {"error": "Invalid JSON output", "raw": strip_json_fences(text)}
+    return parsed
+
+
+__all__ = [
+    "strip_json_fences",
+    "load_json_object",
+    "parse_json_from_model_text",
+]
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
-from video_analysis_models import AnalysisResult
+from analysis_cache import VideoAnalysisCache
+from model_json import load_json_object
+from video_analysis_models import AnalysisResult, parse_analysis_json
 from prompt_templates import build_reveng_system_prompt, build_mastermind_prompt
-from openrouter_client import call_openrouter_video, parse_json_from_model_text
+from openrouter_client import (
+    OpenRouterBatcher,
+    VideoBytes,
+    call_openrouter_video,
+    call_openrouter_video_async,
+    parse_json_from_model_text,
+    run_blocking,
+)
 
 
 # =============================================================================
@@ -114,11 +123,122 @@ JSON SCHEMA:
 """.strip()
 
 
+_T = TypeVar("_T")
+
+_DEFAULT_CACHE: Optional[VideoAnalysisCache] = None
+
+
+def _get_default_cache() -> VideoAnalysisCache:
+    """
+    Return the shared on-disk analysis cache, creating it on first use.
+    """
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = VideoAnalysisCache()
+    return _DEFAULT_CACHE
+
+
+def _call_with_cache(
+    model_name: str,
+    prompt_text: str,
+    video_bytes: VideoBytes,
+    mime_type: str,
+    use_cache: bool,
+    parse: Callable[[str], Optional[_T]],
+) -> Tuple[Dict[str, Any], Optional[_T]]:
+    """
+    `call_openrouter_video` plus `parse(text)`, served from the on-disk cache when possible.
+
+    Returns `(result, parsed)`. A fresh reply is stored only if `parse`
+    accepted it (returned non-None), so an empty or malformed answer is
+    retried on the next call instead of sticking.
+    """
+    cache: Optional[VideoAnalysisCache] = None
+    cache_key = ""
+    if use_cache:
+        cache = _get_default_cache()
+        cache_key = VideoAnalysisCache.make_key(video_bytes, prompt_text, model_name)
+        cached: Optional[Dict[str, Any]] = cache.get(cache_key)
+        if cached is not None:
+            return cached, parse(cached.get("text", "") or "")
+
+    result = call_openrouter_video(
+        model_name=model_name,
+        prompt_text=prompt_text,
+        video_bytes=video_bytes,
+        mime_type=mime_type,
+    )
+    parsed = parse(result.get("text", "") or "")
+    if cache is not None and parsed is not None:
+        cache.set(cache_key, result)
+    return result, parsed
+
+
+async def _call_with_cache_async(
+    model_name: str,
+    prompt_text: str,
+    video_bytes: VideoBytes,
+    mime_type: str,
+    use_cache: bool,
+    parse: Callable[[str], Optional[_T]],
+    batcher: Optional[OpenRouterBatcher] = None,
+) -> Tuple[Dict[str, Any], Optional[_T]]:
+    """
+    Async counterpart of `_call_with_cache`, optionally through `batcher`.
+
+    Hashing, cache I/O and `parse` run on the worker pool.
+    """
+    cache: Optional[VideoAnalysisCache] = None
+    cache_key = ""
+    if use_cache:
+        cache = _get_default_cache()
+        cache_key = await run_blocking(
+            VideoAnalysisCache.make_key, video_bytes, prompt_text, model_name
+        )
+        cached: Optional[Dict[str, Any]] = await run_blocking(cache.get, cache_key)
+        if cached is not None:
+            return cached, await run_blocking(parse, cached.get("text", "") or "")
+
+    if batcher is not None:
+        result = await batcher.submit(
+            model_name=model_name,
+            prompt_text=prompt_text,
+            video_bytes=video_bytes,
+            mime_type=mime_type,
+        )
+    else:
+        result = await call_openrouter_video_async(
+            model_name=model_name,
+            prompt_text=prompt_text,
+            video_bytes=video_bytes,
+            mime_type=mime_type,
+        )
+    parsed = await run_blocking(parse, result.get("text", "") or "")
+    if cache is not None and parsed is not None:
+        await run_blocking(cache.set, cache_key, result)
+    return result, parsed
+
+
+class InvalidModelReply(ValueError):
+    """
+    The model's reply was empty or not valid JSON.
+
+    `raw_response` is the `{"raw": ..., "text": ...}` dict that would have
+    been returned alongside the (empty) analysis.
+    """
+
+    def __init__(self, raw_response: Dict[str, Any]) -> None:
+        super().__init__("The model reply was empty or not valid JSON.")
+        self.raw_response = raw_response
+
+
 def analyze_video_with_openrouter(
     model_name: str,
-    video_bytes: bytes,
+    video_bytes: VideoBytes,
     mime_type: str = "video/mp4",
     custom_prompt: str | None = None,
+    use_cache: bool = True,
+    raise_on_invalid: bool = False,
 ) -> Tuple[AnalysisResult, Dict[str, Any]]:
     """
     Call an OpenRouter video-capable model and parse the result into AnalysisResult.
@@ -128,35 +248,98 @@ def analyze_video_with_openrouter(
         video_bytes: Raw video file bytes
         mime_type: MIME type of the video
         custom_prompt: Optional custom system prompt (defaults to ANALYSIS_SYSTEM_PROMPT)
+        use_cache: Reuse a previous response for the same video/prompt/model
+            from the on-disk cache instead of calling the API again
+        raise_on_invalid: Raise `InvalidModelReply` instead of returning an
+            empty AnalysisResult when the reply is not valid JSON
     
     Returns:
         Tuple of (AnalysisResult, raw_response_dict) where raw_response_dict contains:
-        - "raw": full JSON response from OpenRouter
-        - "text": extracted text from model response
-        - "parsed_json": parsed JSON payload
+        - "raw": response metadata from OpenRouter (`id`, `model`, `provider`,
+          `usage`, and `error` if present)
+        - "text": extracted text from model response (the JSON payload);
+          use `analysis.model_dump()` for the validated data as a dict
     """
     prompt_to_use = custom_prompt if custom_prompt else ANALYSIS_SYSTEM_PROMPT
-    result = call_openrouter_video(
-        model_name=model_name,
-        prompt_text=prompt_to_use,
-        video_bytes=video_bytes,
-        mime_type=mime_type,
+    result, analysis_result = _call_with_cache(
+        model_name, prompt_to_use, video_bytes, mime_type, use_cache, parse_analysis_json
     )
-    text = result.get("text", "") or ""
-    payload: Dict[str, Any] = parse_json_from_model_text(text)
-    analysis_result = AnalysisResult.model_validate(payload)
-    
+
+    raw_response = {
+        "raw": result.get("raw", {}),
+        "text": result.get("text", "") or "",
+    }
+    if analysis_result is None:
+        if raise_on_invalid:
+            raise InvalidModelReply(raw_response)
+        analysis_result = AnalysisResult()
+    return analysis_result, raw_response
+
+
+def analyze_video_with_openrouter_raw(
+    model_name: str,
+    video_bytes: VideoBytes,
+    mime_type: str = "video/mp4",
+    custom_prompt: str | None = None,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    """
+    Like `analyze_video_with_openrouter`, but return the parsed JSON dict only.
+
+    Skips Pydantic validation for callers that do not need the typed
+    AnalysisResult. Invalid JSON yields `{"error": ..., "raw": ...}`.
+    """
+    prompt_to_use = custom_prompt if custom_prompt else ANALYSIS_SYSTEM_PROMPT
+    result, parsed = _call_with_cache(
+        model_name, prompt_to_use, video_bytes, mime_type, use_cache, load_json_object
+    )
+    if parsed is None:
+        return parse_json_from_model_text(result.get("text", "") or "")
+    return parsed
+
+
+async def analyze_video_with_openrouter_async(
+    model_name: str,
+    video_bytes: VideoBytes,
+    mime_type: str = "video/mp4",
+    custom_prompt: str | None = None,
+    batcher: Optional[OpenRouterBatcher] = None,
+    use_cache: bool = True,
+    raise_on_invalid: bool = False,
+) -> Tuple[AnalysisResult, Dict[str, Any]]:
+    """
+    Async variant of `analyze_video_with_openrouter`, sharing its on-disk cache.
+
+    Encoding, hashing, cache I/O, JSON parsing and validation run on worker
+    threads so the event loop stays responsive. When `batcher` is given, the
+    request goes through it so concurrent callers are grouped into bounded bursts.
+    Returns the same `(AnalysisResult, raw_response_dict)` tuple.
+    """
+    prompt_to_use = custom_prompt if custom_prompt else ANALYSIS_SYSTEM_PROMPT
+    result, analysis_result = await _call_with_cache_async(
+        model_name,
+        prompt_to_use,
+        video_bytes,
+        mime_type,
+        use_cache,
+        parse_analysis_json,
+        batcher=batcher,
+    )
+
     raw_response = {
         "raw": result.get("raw", {}),
-        "text": text,
-        "parsed_json": payload,
+        "text": result.get("text", "") or "",
     }
+    if analysis_result is None:
+        if raise_on_invalid:
+            raise InvalidModelReply(raw_response)
+        analysis_result = AnalysisResult()
     return analysis_result, raw_response
 
 
 def reverse_engineer_with_openrouter(
     model_name: str,
-    video_bytes: bytes,
+    video_bytes: VideoBytes,
     target_engine: str,
     subtitle_context: str | None = None,
     mime_type: str = "video/mp4",
@@ -181,7 +364,10 @@ def reverse_engineer_with_openrouter(
 
 __all__ = [
     "ANALYSIS_SYSTEM_PROMPT",
+    "InvalidModelReply",
     "analyze_video_with_openrouter",
+    "analyze_video_with_openrouter_raw",
+    "analyze_video_with_openrouter_async",
     "reverse_engineer_with_openrouter",
 ]
 
@@ -1,57 +1,298 @@
 from __future__ import annotations
 
+import asyncio
 import base64
-import json
+import contextlib
+import functools
+import gzip
 import os
-from typing import Any, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from urllib.parse import urlsplit
 
-import requests
-from dotenv import load_dotenv  # type: ignore[import]
+import ijson  # type: ignore[import]
+import orjson
+
+from analysis_cache import hash_bytes
+from model_json import parse_json_from_model_text, strip_json_fences
+
+# httpx and python-dotenv are imported where they are first needed, so
+# importing this module (e.g. only to parse model output) stays cheap.
+if TYPE_CHECKING:
+    import httpx
 
 
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
+# Raw video data; a memoryview (e.g. Streamlit's `UploadedFile.getbuffer()`)
+# is passed through without copying wherever possible.
+VideoBytes = Union[bytes, memoryview]
+
+_T = TypeVar("_T")
+
+# Worker threads for CPU-bound / blocking helpers used by the async API
+# (base64 encoding, uploads, request serialization, JSON parsing) so they
+# never stall the event loop.
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="openrouter")
+
+# Optional PUT URL (S3/R2/...) used to hand the model an https:// link instead
+# of inlining the whole video as a base64 data URL. A `{key}` placeholder is
+# replaced with the video's content hash so each video gets its own object.
+OPENROUTER_UPLOAD_URL_ENV = "OPENROUTER_UPLOAD_URL"
+# Optional public URL of the uploaded object, when it differs from the upload
+# URL; may contain the same `{key}` placeholder.
+OPENROUTER_UPLOAD_PUBLIC_URL_ENV = "OPENROUTER_UPLOAD_PUBLIC_URL"
+_UPLOAD_KEY_PLACEHOLDER = "{key}"
+
+# `(content_key, mime_type) -> (upload_url, public_url)`, e.g. to presign a
+# fresh PUT URL per video; see `set_upload_url_factory`.
+UploadUrlFactory = Callable[[str, str], Tuple[str, str]]
+_UPLOAD_URL_FACTORY: Optional[UploadUrlFactory] = None
+
+# Held from upload until the model has answered when every upload goes to the
+# same object (a fixed `OPENROUTER_UPLOAD_URL`), so concurrent requests cannot
+# overwrite each other's video. Async callers wait for it on a dedicated
+# thread, never on `_EXECUTOR`, which the lock holder still needs.
+_SHARED_UPLOAD_LOCK = threading.Lock()
+_UPLOAD_LOCK_WAITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="openrouter-upload")
+# Set to "1" to gzip request bodies (Content-Encoding: gzip).
+OPENROUTER_GZIP_REQUESTS_ENV = "OPENROUTER_GZIP_REQUESTS"
+
+
+_API_KEY: Optional[str] = None
+
 
 def load_openrouter_api_key() -> str:
     """
     Load the OpenRouter API key from environment or .env file.
 
     Expected variable: OPENROUTER_API_KEY
+
+    The key is cached after the first successful lookup, so `.env` is only
+    read once per process. Concurrent first calls may both read it, which is
+    harmless since they store the same value.
+    """
+    global _API_KEY
+    if _API_KEY is None:
+        from dotenv import load_dotenv  # type: ignore[import]
+
+        load_dotenv()
+        api_key = os.getenv("OPENROUTER_API_KEY")
+        if not api_key:
+            raise RuntimeError(
+                "OPENROUTER_API_KEY is not set. Define it in your environment or .env file."
+            )
+        _API_KEY = api_key
+    return _API_KEY
+
+
+# JSON-encoded `"data:<mime>;base64,` openings, keyed by MIME type.
+_DATA_URL_PREFIXES: Dict[str, bytes] = {}
+
+
+def _encode_video_to_data_url_json(
+    video_bytes: VideoBytes,
+    mime_type: str = "video/mp4",
+) -> bytes:
+    """
+    Encode raw video bytes into a base64 data URL accepted by OpenRouter.
+
+    The URL is returned already serialized as a JSON string (quotes included),
+    ready to splice into the request body, so the multi-MB base64 body is never
+    decoded into a str or re-copied by an f-string.
+    """
+    prefix = _DATA_URL_PREFIXES.get(mime_type)
+    if prefix is None:
+        # Drop the closing quote; the base64 alphabet needs no JSON escaping.
+        prefix = orjson.dumps(f"data:{mime_type};base64,")[:-1]
+        _DATA_URL_PREFIXES[mime_type] = prefix
+    return b"".join((prefix, base64.b64encode(video_bytes), b'"'))
+
+
+def set_upload_url_factory(factory: Optional[UploadUrlFactory]) -> None:
     """
-    load_dotenv()
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    if not api_key:
+    Use `factory(content_key, mime_type) -> (upload_url, public_url)` for uploads.
+
+    Takes precedence over `OPENROUTER_UPLOAD_URL`; pass None to go back to the
+    environment configuration. `content_key` is the video's content hash.
+    """
+    global _UPLOAD_URL_FACTORY
+    _UPLOAD_URL_FACTORY = factory
+
+
+def _uploads_enabled() -> bool:
+    return _UPLOAD_URL_FACTORY is not None or bool(os.getenv(OPENROUTER_UPLOAD_URL_ENV))
+
+
+def _uploads_share_one_object() -> bool:
+    """
+    True when every upload would overwrite the same `OPENROUTER_UPLOAD_URL` object.
+    """
+    if _UPLOAD_URL_FACTORY is not None:
+        return False
+    upload_url = os.getenv(OPENROUTER_UPLOAD_URL_ENV)
+    if not upload_url:
+        return False
+    return _UPLOAD_KEY_PLACEHOLDER not in upload_url
+
+
+def _upload_urls(content_key: str, mime_type: str) -> Tuple[str, str]:
+    """
+    Return `(upload_url, public_url)` for the video with hash `content_key`.
+    """
+    if _UPLOAD_URL_FACTORY is not None:
+        return _UPLOAD_URL_FACTORY(content_key, mime_type)
+
+    upload_url = os.getenv(OPENROUTER_UPLOAD_URL_ENV)
+    if not upload_url:
         raise RuntimeError(
-            "OPENROUTER_API_KEY is not set. Define it in your environment or .env file."
+            f"{OPENROUTER_UPLOAD_URL_ENV} is not set. Define it in your environment or .env file."
         )
-    return api_key
+    upload_url = upload_url.replace(_UPLOAD_KEY_PLACEHOLDER, content_key)
+    public_url = os.getenv(OPENROUTER_UPLOAD_PUBLIC_URL_ENV)
+    if public_url:
+        return upload_url, public_url.replace(_UPLOAD_KEY_PLACEHOLDER, content_key)
+    return upload_url, urlsplit(upload_url)._replace(query="", fragment="").geturl()
 
 
-def _encode_video_to_data_url(video_bytes: bytes, mime_type: str = "video/mp4") -> str:
+def upload_video_and_get_url(video_bytes: VideoBytes, mime_type: str = "video/mp4") -> str:
     """
-    Encode raw video bytes into a base64 data URL accepted by OpenRouter.
+    Upload raw video bytes to object storage and return the URL to fetch it from.
+
+    The target comes from `set_upload_url_factory` or, failing that,
+    `OPENROUTER_UPLOAD_URL` with `{key}` replaced by the content hash. The
+    returned URL is `OPENROUTER_UPLOAD_PUBLIC_URL` if set, otherwise the upload
+    URL with its query string (the presigned signature) removed.
+
+    A fixed `OPENROUTER_UPLOAD_URL` without `{key}` names a single object, so
+    `call_openrouter_video` / `call_openrouter_video_async` then run uploads
+    and their requests one at a time.
     """
-    b64 = base64.b64encode(video_bytes).decode("utf-8")
-    return f"data:{mime_type};base64,{b64}"
+    upload_url, public_url = _upload_urls(hash_bytes(video_bytes), mime_type)
 
+    # Pass the buffer itself rather than a chunk generator: httpx then sends a
+    # Content-Length body straight from memory, whereas a generator switches to
+    # chunked transfer encoding, which presigned S3 PUTs reject.
+    # Deliberately not the shared OpenRouter client: it carries the API key.
+    import httpx
 
-def call_openrouter_video(
-    model_name: str,
-    prompt_text: str,
-    video_bytes: bytes,
-    mime_type: str = "video/mp4",
-) -> Dict[str, Any]:
+    # httpx only sends bytes as-is, so a memoryview is copied here, at the boundary.
+    resp = httpx.put(
+        upload_url,
+        content=video_bytes if isinstance(video_bytes, bytes) else bytes(video_bytes),
+        headers={"Content-Type": mime_type},
+        timeout=300,
+    )
+    resp.raise_for_status()
+    return public_url
+
+
+def _resolve_video_url(video_bytes: VideoBytes, mime_type: str = "video/mp4") -> bytes:
     """
-    Call an OpenRouter video-capable model with a text + video message.
+    Return the URL to send in the `video_url` message part, as pre-serialized JSON.
 
-    Returns a dict with at least:
-      - `raw`: the full JSON response from OpenRouter
-      - `text`: the first text segment from the model's reply (if any)
+    Uploads to object storage when an upload target is configured and falls
+    back to an inline base64 data URL otherwise.
+    """
+    if _uploads_enabled():
+        public_url = upload_video_and_get_url(video_bytes, mime_type=mime_type)
+        return orjson.dumps(public_url)
+    return _encode_video_to_data_url_json(video_bytes, mime_type=mime_type)
+
+
+@contextlib.contextmanager
+def _upload_slot() -> Iterator[None]:
+    """
+    Hold `_SHARED_UPLOAD_LOCK` for one upload + request if uploads share an object.
+    """
+    if not _uploads_share_one_object():
+        yield
+        return
+    with _SHARED_UPLOAD_LOCK:
+        yield
+
+
+@contextlib.asynccontextmanager
+async def _upload_slot_async() -> AsyncIterator[None]:
+    """
+    Async counterpart of `_upload_slot`; waits for the lock off the event loop.
+    """
+    if not _uploads_share_one_object():
+        yield
+        return
+    acquired = asyncio.get_running_loop().run_in_executor(
+        _UPLOAD_LOCK_WAITER, _SHARED_UPLOAD_LOCK.acquire
+    )
+    try:
+        await asyncio.shield(acquired)
+    except asyncio.CancelledError:
+        # The waiter thread still takes the lock; hand it straight back.
+        acquired.add_done_callback(lambda _: _SHARED_UPLOAD_LOCK.release())
+        raise
+    try:
+        yield
+    finally:
+        _SHARED_UPLOAD_LOCK.release()
+
+
+def _client_options() -> Dict[str, Any]:
+    """
+    Keyword arguments shared by the sync and async OpenRouter clients.
     """
-    api_key = load_openrouter_api_key()
+    import httpx
+
+    return {
+        "http2": True,
+        "timeout": 300,
+        "limits": httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        "headers": {
+            "Authorization": f"Bearer {load_openrouter_api_key()}",
+            "Content-Type": "application/json",
+        },
+    }
+
+
+# Shared across sync calls so TLS connections to openrouter.ai are reused
+# (HTTP/2 also multiplexes concurrent calls from several threads on one socket).
+_CLIENT: Optional[httpx.Client] = None
+_CLIENT_LOCK = threading.Lock()
 
-    data_url = _encode_video_to_data_url(video_bytes, mime_type=mime_type)
 
+def _get_client() -> httpx.Client:
+    """
+    Return the module-level HTTP/2 client, creating it on first use.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        with _CLIENT_LOCK:
+            if _CLIENT is None:
+                import httpx
+
+                _CLIENT = httpx.Client(**_client_options())
+    return _CLIENT
+
+
+def _build_payload(
+    model_name: str,
+    prompt_text: str,
+    video_url: str,
+) -> Dict[str, Any]:
+    """
+    Build the JSON payload for a text + video chat completion.
+    """
     messages = [
         {
             "role": "user",
@@ -59,66 +300,433 @@ def call_openrouter_video(
                 {"type": "text", "text": prompt_text},
                 {
                     "type": "video_url",
-                    "video_url": {"url": data_url},
+                    "video_url": {"url": video_url},
                 },
             ],
         }
     ]
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-
-    payload = {
+    return {
         "model": model_name,
         "messages": messages,
     }
 
-    resp = requests.post(OPENROUTER_API_URL, headers=headers, json=payload, timeout=300)
-    resp.raise_for_status()
-    resp_json = resp.json()
 
-    # Extract first text response, following OpenAI-style schema.
-    text_out = ""
-    try:
-        choice = resp_json["choices"][0]
-        content = choice["message"]["content"]
-        # content is typically a list of segments; grab the first text item
-        if isinstance(content, list):
-            for part in content:
-                if part.get("type") == "text":
-                    text_out = part.get("text", "")
-                    if text_out:
+# Stand-in for the video URL when serializing the static part of a request.
+_VIDEO_URL_PLACEHOLDER = "__VIDEO_URL__"
+
+
+@functools.lru_cache(maxsize=16)
+def _request_body_template(model_name: str, prompt_text: str) -> Tuple[bytes, bytes]:
+    """
+    Pre-serialize everything except the video URL, returning `(head, tail)`.
+
+    The multi-KB prompt is JSON-encoded once per (model, prompt) instead of on
+    every request. The placeholder is the last string in the payload, and any
+    quote inside the prompt is escaped, so `rpartition` always splits on it.
+    """
+    body = orjson.dumps(_build_payload(model_name, prompt_text, _VIDEO_URL_PLACEHOLDER))
+    head, _, tail = body.rpartition(orjson.dumps(_VIDEO_URL_PLACEHOLDER))
+    return head, tail
+
+
+def _prepare_request_body(
+    model_name: str,
+    prompt_text: str,
+    video_bytes: VideoBytes,
+    mime_type: str = "video/mp4",
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize the chat completion request, returning `(body, extra_headers)`.
+
+    Resolves the video URL (upload or base64 data URL) and, when
+    `OPENROUTER_GZIP_REQUESTS=1`, gzips the body. Compression mostly wins on
+    the text prompt; base64 media is close to incompressible, so
+    `compresslevel=1` keeps the CPU cost negligible.
+    """
+    video_url = _resolve_video_url(video_bytes, mime_type=mime_type)
+    head, tail = _request_body_template(model_name, prompt_text)
+    body = b"".join((head, video_url, tail))
+    if os.getenv(OPENROUTER_GZIP_REQUESTS_ENV) == "1":
+        return gzip.compress(body, compresslevel=1), {"Content-Encoding": "gzip"}
+    return body, {}
+
+
+async def _prepare_request_body_async(
+    model_name: str,
+    prompt_text: str,
+    video_bytes: VideoBytes,
+    mime_type: str = "video/mp4",
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Run `_prepare_request_body` (encoding, upload, serialization) on the worker pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _EXECUTOR, _prepare_request_body, model_name, prompt_text, video_bytes, mime_type
+    )
+
+
+# Top-level response fields kept in `raw`; everything else is dropped after the
+# text is extracted so large responses are not kept alive by callers.
+_RAW_METADATA_KEYS = ("id", "model", "provider", "usage", "error")
+
+# Read size when streaming the response body into the incremental parser.
+_RESPONSE_CHUNK_SIZE = 64 * 1024
+
+
+class _ResponseExtractor:
+    """
+    Incrementally extract `{"raw": <metadata>, "text": <reply>}` from a
+    chat completion body fed in chunks.
+
+    Only the first text segment of `choices[0].message.content` and the
+    `_RAW_METADATA_KEYS` fields are materialized; the rest of the response is
+    parsed and discarded, so the full body is never buffered.
+    """
+
+    _CHOICE = "choices.item"
+    _CONTENT = "choices.item.message.content"
+    _PART = "choices.item.message.content.item"
+
+    def __init__(self) -> None:
+        self._events = ijson.sendable_list()
+        self._parser = ijson.parse_coro(self._events, use_float=True)
+        self._raw: Dict[str, Any] = {}
+        self._builder: Optional[ijson.ObjectBuilder] = None
+        self._builder_key = ""
+        self._choice_index = -1
+        self._part: Dict[str, Any] = {}
+        self._text = ""
+
+    def feed(self, chunk: bytes) -> None:
+        self._parser.send(chunk)
+        self._drain()
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Return the extracted result.
+
+        Raises RuntimeError when the body carries an `error` and no choices,
+        which OpenRouter can send with a 200 status.
+        """
+        self._parser.close()
+        self._drain()
+        error = self._raw.get("error")
+        if error is not None and self._choice_index < 0:
+            message = error.get("message") if isinstance(error, dict) else None
+            raise RuntimeError(f"OpenRouter returned an error: {message or error}")
+        return {"raw": self._raw, "text": self._text}
+
+    def _drain(self) -> None:
+        for prefix, event, value in self._events:
+            self._on_event(prefix, event, value)
+        del self._events[:]
+
+    def _on_event(self, prefix: str, event: str, value: Any) -> None:
+        # Metadata values (e.g. the `usage` object) are rebuilt as-is.
+        if self._builder is not None:
+            self._builder.event(event, value)
+            if prefix == self._builder_key and event in ("end_map", "end_array"):
+                self._raw[self._builder_key] = self._builder.value
+                self._builder = None
+            return
+        if prefix in _RAW_METADATA_KEYS:
+            if event in ("start_map", "start_array"):
+                self._builder = ijson.ObjectBuilder()
+                self._builder_key = prefix
+                self._builder.event(event, value)
+            else:
+                self._raw[prefix] = value
+            return
+
+        if prefix == self._CHOICE and event == "start_map":
+            self._choice_index += 1
+            return
+        if self._choice_index != 0 or self._text:
+            return
+        # content is either a plain string or a list of segments; for a list,
+        # grab the first non-empty text item.
+        if prefix == self._CONTENT and event == "string":
+            self._text = value
+        elif prefix == self._PART:
+            if event == "start_map":
+                self._part = {}
+            elif event == "end_map" and self._part.get("type") == "text":
+                self._text = self._part.get("text") or ""
+        elif prefix in (f"{self._PART}.type", f"{self._PART}.text") and event == "string":
+            self._part[prefix.rsplit(".", 1)[1]] = value
+
+
+def call_openrouter_video(
+    model_name: str,
+    prompt_text: str,
+    video_bytes: VideoBytes,
+    mime_type: str = "video/mp4",
+) -> Dict[str, Any]:
+    """
+    Call an OpenRouter video-capable model with a text + video message.
+
+    Returns a dict with at least:
+      - `raw`: response metadata from OpenRouter (`id`, `model`, `provider`,
+        `usage`, and `error` if present)
+      - `text`: the first text segment from the model's reply (if any)
+
+    Raises RuntimeError if the response is an `error` without any choices.
+    """
+    client = _get_client()
+
+    extractor = _ResponseExtractor()
+    with _upload_slot():
+        body, extra_headers = _prepare_request_body(
+            model_name, prompt_text, video_bytes, mime_type=mime_type
+        )
+
+        with client.stream(
+            "POST", OPENROUTER_API_URL, content=body, headers=extra_headers
+        ) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_bytes(_RESPONSE_CHUNK_SIZE):
+                extractor.feed(chunk)
+    return extractor.finish()
+
+
+# Shared across all async calls so TLS connections to openrouter.ai are reused.
+# Its connections belong to the event loop it was created on (`_SESSION_LOOP`).
+_SESSION: Optional[httpx.AsyncClient] = None
+_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def get_session() -> httpx.AsyncClient:
+    """
+    Return the module-level async HTTP/2 client, creating it on first use.
+
+    A new client is built when the running event loop is not the one the
+    current client was created on (e.g. across separate `asyncio.run()` calls);
+    the old client's connections died with its loop, so it is just dropped.
+
+    No lock is needed: there is no `await` between the check and the
+    assignment, so concurrent coroutines cannot interleave here.
+    """
+    global _SESSION, _SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    if _SESSION is None or _SESSION.is_closed or _SESSION_LOOP is not loop:
+        import httpx
+
+        _SESSION = httpx.AsyncClient(**_client_options())
+        _SESSION_LOOP = loop
+    return _SESSION
+
+
+async def close_session() -> None:
+    """
+    Close the shared async client (call before the event loop shuts down).
+    """
+    global _SESSION, _SESSION_LOOP
+    if _SESSION is not None:
+        if _SESSION_LOOP is asyncio.get_running_loop():
+            await _SESSION.aclose()
+        _SESSION = None
+        _SESSION_LOOP = None
+
+
+async def call_openrouter_video_async(
+    model_name: str,
+    prompt_text: str,
+    video_bytes: VideoBytes,
+    mime_type: str = "video/mp4",
+) -> Dict[str, Any]:
+    """
+    Async variant of `call_openrouter_video` using the shared async client.
+
+    Returns the same `{"raw": ..., "text": ...}` dict.
+    """
+    session = await get_session()
+
+    extractor = _ResponseExtractor()
+    async with _upload_slot_async():
+        body, extra_headers = await _prepare_request_body_async(
+            model_name, prompt_text, video_bytes, mime_type=mime_type
+        )
+
+        async with session.stream(
+            "POST", OPENROUTER_API_URL, content=body, headers=extra_headers
+        ) as resp:
+            resp.raise_for_status()
+            async for chunk in resp.aiter_bytes(_RESPONSE_CHUNK_SIZE):
+                extractor.feed(chunk)
+    return extractor.finish()
+
+
+async def analyze_many(
+    videos: List[Tuple[bytes, str]],
+    model_name: str,
+    prompt_text: str,
+) -> List[Dict[str, Any]]:
+    """
+    Run `call_openrouter_video_async` concurrently for `(video_bytes, mime_type)` pairs.
+
+    Results are returned in the same order as `videos`.
+    """
+    return await asyncio.gather(
+        *[
+            call_openrouter_video_async(
+                model_name=model_name,
+                prompt_text=prompt_text,
+                video_bytes=video_bytes,
+                mime_type=mime_type,
+            )
+            for video_bytes, mime_type in videos
+        ]
+    )
+
+
+class OpenRouterBatcher:
+    """
+    Client-side micro-batcher in front of `call_openrouter_video_async`.
+
+    Submitted requests are collected until `max_batch_size` are queued or
+    `max_wait` seconds have passed since the first one, then dispatched
+    together with `asyncio.gather`. OpenRouter has no batch endpoint, so a
+    batch is a bounded burst of concurrent calls: at most `max_batch_size`
+    requests are in flight at once.
+    """
+
+    def __init__(self, max_batch_size: int = 8, max_wait: float = 0.05) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        model_name: str,
+        prompt_text: str,
+        video_bytes: VideoBytes,
+        mime_type: str = "video/mp4",
+    ) -> Dict[str, Any]:
+        """
+        Queue one request and wait for its `{"raw": ..., "text": ...}` result.
+        """
+        queue = self._queue
+        if queue is None or self._worker is None or self._worker.done():
+            queue = self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        await queue.put((model_name, prompt_text, video_bytes, mime_type, future))
+        return await future
+
+    async def close(self) -> None:
+        """
+        Stop the background worker; requests still queued or in flight are cancelled.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._queue.get_nowait()[-1].cancel()
+            self._queue = None
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[str, str, VideoBytes, str, asyncio.Future]] = []
+        try:
+            while True:
+                batch = []
+                batch.append(await queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
                         break
-        elif isinstance(content, str):
-            text_out = content
-    except (KeyError, IndexError, TypeError):
-        text_out = ""
+                await self._dispatch(batch)
+        except asyncio.CancelledError:
+            # These items are already off the queue, so `close()` can't see
+            # them; cancel their futures so submitters don't wait forever.
+            for *_, future in batch:
+                future.cancel()
+            raise
 
-    return {"raw": resp_json, "text": text_out}
+    @staticmethod
+    async def _dispatch(batch: List[Tuple[str, str, VideoBytes, str, asyncio.Future]]) -> None:
+        results = await asyncio.gather(
+            *[
+                call_openrouter_video_async(
+                    model_name=model_name,
+                    prompt_text=prompt_text,
+                    video_bytes=video_bytes,
+                    mime_type=mime_type,
+                )
+                for model_name, prompt_text, video_bytes, mime_type, _ in batch
+            ],
+            return_exceptions=True,
+        )
+        for (*_, future), result in zip(batch, results):
+            if future.done():
+                # The submitter gave up (e.g. was cancelled) while we were waiting.
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
 
 
-def parse_json_from_model_text(text: str) -> Dict[str, Any]:
+def analyze_many_sync(
+    videos: List[Tuple[bytes, str]],
+    model_name: str,
+    prompt_text: str,
+) -> List[Dict[str, Any]]:
     """
-    Best-effort JSON parsing with simple cleanup for common artifacts.
+    Blocking wrapper around `analyze_many` for scripts and CLIs.
     """
-    cleaned = text.strip()
-    if cleaned.startswith("```"):
-        first_fence_end = cleaned.find("\n")
-        if first_fence_end != -1:
-            cleaned = cleaned[first_fence_end + 1 :]
-        if cleaned.rstrip().endswith("```"):
-            cleaned = cleaned.rstrip()[:-3]
-    try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        return {"error": "Invalid JSON output", "raw": cleaned}
+
+    async def _run() -> List[Dict[str, Any]]:
+        try:
+            return await analyze_many(videos, model_name, prompt_text)
+        finally:
+            # The session is bound to this event loop, which asyncio.run closes.
+            await close_session()
+
+    return asyncio.run(_run())
+
+
+async def run_blocking(func: Callable[..., _T], *args: Any) -> _T:
+    """
+    Run `func(*args)` on the module's worker pool and await the result.
+
+    For CPU-bound steps of the async API (e.g. parsing or validating model
+    output) that would otherwise stall the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_EXECUTOR, func, *args)
 
 
 __all__ = [
+    "VideoBytes",
     "load_openrouter_api_key",
+    "UploadUrlFactory",
+    "set_upload_url_factory",
+    "upload_video_and_get_url",
     "call_openrouter_video",
+    "call_openrouter_video_async",
+    "get_session",
+    "close_session",
+    "analyze_many",
+    "analyze_many_sync",
+    "OpenRouterBatcher",
+    "strip_json_fences",
     "parse_json_from_model_text",
+    "run_blocking",
 ]
 
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import functools
+from string import Template
+
 
 # =============================================================================
 # VideoMasterMind v2 - Unified Analysis Prompt
@@ -117,18 +120,30 @@ JSON SCHEMA:
 # Legacy template kept for backward compatibility
 VIDEO_REV_ENG_PROMPT_TEMPLATE = VIDEOMASTERMIND_V2_PROMPT
 
+# The public prompts keep their `{{NAME}}` placeholders so existing
+# `.replace("{{TARGET_ENGINE}}", ...)` callers still work. A `$NAME` copy is
+# built once at import; substitute() then fills both placeholders in one pass.
+_VIDEOMASTERMIND_V2_TEMPLATE = Template(
+    VIDEOMASTERMIND_V2_PROMPT.replace("{{TARGET_ENGINE}}", "${TARGET_ENGINE}").replace(
+        "{{SUBTITLE_CONTEXT}}", "${SUBTITLE_CONTEXT}"
+    )
+)
+
 
+@functools.lru_cache(maxsize=128)
 def build_reveng_system_prompt(
     target_engine: str,
     subtitle_context: str | None = None,
 ) -> str:
     """
     Injects target engine and optional subtitle context into the VideoMasterMind_v2 system prompt.
+
+    Results are cached per `(target_engine, subtitle_context)`.
     """
-    subtitle_context = subtitle_context or ""
-    prompt = VIDEOMASTERMIND_V2_PROMPT.replace("{{TARGET_ENGINE}}", target_engine)
-    prompt = prompt.replace("{{SUBTITLE_CONTEXT}}", subtitle_context)
-    return prompt
+    return _VIDEOMASTERMIND_V2_TEMPLATE.substitute(
+        TARGET_ENGINE=target_engine,
+        SUBTITLE_CONTEXT=subtitle_context or "",
+    )
 
 
 def build_mastermind_prompt(
@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+import hashlib
+import math
+import os
+from typing import Any, Dict, Tuple
+
+import numpy as np
 import pandas as pd
 import streamlit as st
+import xxhash
 
-from openrouter_analysis import analyze_video_with_openrouter, ANALYSIS_SYSTEM_PROMPT
+from analysis_cache import VideoAnalysisCache
+from openrouter_analysis import (
+    analyze_video_with_openrouter,
+    ANALYSIS_SYSTEM_PROMPT,
+    InvalidModelReply,
+)
+from video_analysis_models import AnalysisResult
 
 
 # NOTE:
@@ -36,33 +49,202 @@ VIDEO_MODELS = [
 ]
 
 
+RESULT_CACHE_PATH = os.path.join(".analysis_cache", "cache.sqlite3")
+
+
+@st.cache_resource
+def _get_result_cache() -> VideoAnalysisCache:
+    """Persistent result cache shared by all sessions (survives server restarts)."""
+    return VideoAnalysisCache(RESULT_CACHE_PATH)
+
+
+def _analysis_cache_key(model_name: str, mime_type: str, prompt: str, video_digest: str) -> str:
+    """Content-addressed key for one analysis request."""
+    key_src = "\0".join((model_name, mime_type, prompt, video_digest))
+    return hashlib.sha256(key_src.encode("utf-8")).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=24 * 3600)
+def _cached_analyze(
+    model_name: str,
+    mime_type: str,
+    prompt: str,
+    video_digest: str,
+    _video_bytes: memoryview,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Run the OpenRouter analysis, memoized across reruns.
+
+    The cache key is (model, MIME type, prompt, xxh3 video digest); the
+    leading underscore keeps Streamlit from hashing the video bytes themselves.
+    On an in-memory miss the persistent result cache, keyed by SHA-256 since
+    it outlives the process, is checked before calling the API, and fresh
+    results are written back to it. Replies that are not valid JSON raise
+    `InvalidModelReply` instead; Streamlit does not memoize a call that
+    raises, so neither cache keeps them and the next "Analyze" click retries.
+    Returns `(analysis.model_dump(), raw_response)`.
+    """
+    result_cache = _get_result_cache()
+    video_sha256 = hashlib.sha256(_video_bytes).hexdigest()
+    cache_key = _analysis_cache_key(model_name, mime_type, prompt, video_sha256)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        payload, raw_response = cached
+        return payload, raw_response
+
+    analysis, raw_response = analyze_video_with_openrouter(
+        model_name=model_name,
+        video_bytes=_video_bytes,
+        mime_type=mime_type,
+        custom_prompt=prompt,
+        # The result cache above already persists this call.
+        use_cache=False,
+        raise_on_invalid=True,
+    )
+    payload = analysis.model_dump()
+    result_cache.set(cache_key, [payload, raw_response])
+    return payload, raw_response
+
+
+# Column order of the timeline segments table.
+_SEG_COLS = (
+    "segment_id",
+    "start",
+    "end",
+    "type",
+    "shot_type",
+    "camera",
+    # Engagement mechanics
+    "is_hook",
+    "tactic",
+    "trigger",
+    # IR
+    "ir_concept",
+)
+
+
+@st.cache_resource
+def _segments_column_config() -> Dict[str, Any]:
+    """
+    Column config for the segments table.
+
+    Streamlit re-executes this script on every rerun, so a plain module-level
+    dict would be rebuilt each time; `cache_resource` builds it once per process.
+    """
+    return {
+        "is_hook": st.column_config.CheckboxColumn("Hook?", default=False),
+        "segment_id": st.column_config.TextColumn("ID"),
+        "start": st.column_config.TextColumn("Start"),
+        "end": st.column_config.TextColumn("End"),
+        "type": st.column_config.TextColumn("Type"),
+        "shot_type": st.column_config.TextColumn("Shot"),
+        "camera": st.column_config.TextColumn("Camera"),
+        "tactic": st.column_config.TextColumn("Retention Tactic"),
+        "trigger": st.column_config.TextColumn("Psych Trigger"),
+        "ir_concept": st.column_config.TextColumn("IR Concept", width="large"),
+    }
+
+
+def _segment_columns(n: int) -> Dict[str, Any]:
+    """Empty column arrays (keyed by `_SEG_COLS`) for an `n`-row segments table."""
+    cols: Dict[str, Any] = {c: [None] * n for c in _SEG_COLS}
+    # Boolean column stays a real bool array instead of object dtype.
+    cols["is_hook"] = np.zeros(n, dtype=bool)
+    return cols
+
+
+def _set_segment_row(cols: Dict[str, Any], i: int, seg) -> None:
+    """Write `seg` into row `i` of the column arrays from `_segment_columns`."""
+    classification = seg.classification
+    visual = seg.visual_analysis
+    engagement = seg.engagement_mechanics
+    ir = seg.ir_reconstruction
+    time_range = seg.time_range
+
+    cols["segment_id"][i] = seg.segment_id
+    if time_range:
+        cols["start"][i] = time_range.start
+        cols["end"][i] = time_range.end
+    if classification:
+        cols["type"][i] = classification.type
+    if visual:
+        cols["shot_type"][i] = visual.shot_type
+        cols["camera"][i] = visual.camera_movement
+    if engagement:
+        cols["is_hook"][i] = engagement.is_hook
+        cols["tactic"][i] = engagement.tactic
+        cols["trigger"][i] = engagement.psychological_trigger
+    if ir:
+        cols["ir_concept"][i] = ir.abstract_concept
+
+
 def build_segments_dataframe(analysis) -> pd.DataFrame:
     """Build a DataFrame with timeline segments including engagement and IR data."""
-    rows = []
-    for seg in analysis.timeline_segments:
-        classification = seg.classification or {}
-        visual = seg.visual_analysis or {}
-        ocr = seg.text_extraction_ocr
-        engagement = seg.engagement_mechanics or {}
-        ir = seg.ir_reconstruction or {}
-        
-        rows.append(
-            {
-                "segment_id": seg.segment_id,
-                "start": (seg.time_range.start if seg.time_range else getattr(seg, "start", None)),
-                "end": (seg.time_range.end if seg.time_range else getattr(seg, "end", None)),
-                "type": getattr(classification, "type", None),
-                "shot_type": getattr(visual, "shot_type", None),
-                "camera": getattr(visual, "camera_movement", None),
-                # Engagement mechanics
-                "is_hook": getattr(engagement, "is_hook", False),
-                "tactic": getattr(engagement, "tactic", None),
-                "trigger": getattr(engagement, "psychological_trigger", None),
-                # IR
-                "ir_concept": getattr(ir, "abstract_concept", None),
-            }
-        )
-    return pd.DataFrame(rows)
+    # Filled column by column (dict of lists) so pandas takes its columnar
+    # fast path instead of transposing per-row records.
+    segments = analysis.timeline_segments
+    cols = _segment_columns(len(segments))
+    for i, seg in enumerate(segments):
+        _set_segment_row(cols, i, seg)
+    return pd.DataFrame(cols, columns=_SEG_COLS, copy=False)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _segment_partitions(analysis_key: str, _analysis) -> Tuple[list, list, pd.DataFrame]:
+    """
+    Split segments for the detail tabs and build the segments table.
+
+    Returns `(segments_with_ir, segments_with_engagement, segments_df)`,
+    memoized per analysis (see `_analysis_cache_key`).
+    """
+    segments_with_ir = []
+    segments_with_engagement = []
+    for seg in _analysis.timeline_segments:
+        if seg.ir_reconstruction and seg.ir_reconstruction.generative_prompt:
+            segments_with_ir.append(seg)
+        if seg.engagement_mechanics:
+            segments_with_engagement.append(seg)
+    df = build_segments_dataframe(_analysis)
+    return segments_with_ir, segments_with_engagement, df
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_analysis_dump(analysis_key: str, _analysis) -> Dict[str, Any]:
+    """`analysis.model_dump()`, memoized per analysis (see `_analysis_cache_key`)."""
+    return _analysis.model_dump()
+
+
+@st.fragment
+def display_large_dataframe(
+    df: pd.DataFrame, page_size: int = 50, key: str = "page", **kwargs: Any
+) -> None:
+    """
+    Render `df` with `st.dataframe`, one page of `page_size` rows at a time.
+
+    Small frames are shown directly; larger ones get a page selector so only
+    the visible slice is serialized to the browser on each rerun. Runs as a
+    fragment, so changing page reruns only this block.
+    """
+    if len(df) <= page_size:
+        st.dataframe(df, **kwargs)
+        return
+
+    n_pages = math.ceil(len(df) / page_size)
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key=key)
+    start = (int(page) - 1) * page_size
+    st.dataframe(df.iloc[start : start + page_size], **kwargs)
+    st.caption(f"Rows {start + 1}-{min(start + page_size, len(df))} of {len(df)}")
+
+
+@st.fragment
+def display_raw_json(analysis_key: str, analysis, raw_response: Dict[str, Any]) -> None:
+    """Display the full analysis (on request) and the raw API response."""
+    with st.expander("Show Full Analysis JSON (heavy)"):
+        if st.checkbox("Render", key="render_json"):
+            st.json(_cached_analysis_dump(analysis_key, analysis), expanded=False)
+
+    st.markdown("**Raw API Response:**")
+    st.json(raw_response, expanded=False)
 
 
 def display_virality_metrics(analysis) -> None:
@@ -93,13 +275,8 @@ def display_virality_metrics(analysis) -> None:
         st.info(virality.share_trigger or "N/A")
 
 
-def display_ir_prompts(analysis) -> None:
-    """Display IR reconstruction prompts for each scene."""
-    segments_with_ir = [
-        seg for seg in analysis.timeline_segments
-        if seg.ir_reconstruction and seg.ir_reconstruction.generative_prompt
-    ]
-    
+def display_ir_prompts(segments_with_ir) -> None:
+    """Display IR reconstruction prompts for each scene that has one."""
     if not segments_with_ir:
         st.info("No IR reconstruction prompts available.")
         return
@@ -117,13 +294,8 @@ def display_ir_prompts(analysis) -> None:
             st.code(ir.generative_prompt or "N/A", language=None)
 
 
-def display_engagement_details(analysis) -> None:
-    """Display detailed engagement mechanics for each scene."""
-    segments_with_engagement = [
-        seg for seg in analysis.timeline_segments
-        if seg.engagement_mechanics
-    ]
-    
+def display_engagement_details(segments_with_engagement) -> None:
+    """Display detailed engagement mechanics for each scene that has them."""
     if not segments_with_engagement:
         st.info("No engagement mechanics data available.")
         return
@@ -191,92 +363,97 @@ def main() -> None:
             st.warning("Please upload a video file first.")
             return
 
-        video_bytes = uploaded.read()
+        # Zero-copy view of Streamlit's upload buffer (no second copy via .read()).
+        video_buffer = uploaded.getbuffer()
         mime_type = uploaded.type or "video/mp4"
+        # Fast non-cryptographic digest for the in-process caches only.
+        video_digest = xxhash.xxh3_128_hexdigest(video_buffer)
 
+        invalid_reply = False
         with st.spinner("Analyzing video with LLM models..."):
             try:
-                analysis, raw_response = analyze_video_with_openrouter(
-                    model_name=model_name,
-                    video_bytes=video_bytes,
-                    mime_type=mime_type,
-                    custom_prompt=system_prompt,
+                payload, raw_response = _cached_analyze(
+                    model_name, mime_type, system_prompt, video_digest, video_buffer
                 )
+            except InvalidModelReply as e:
+                st.warning(f"{e} It was not cached; analyze again to retry.")
+                payload, raw_response = AnalysisResult().model_dump(), e.raw_response
+                invalid_reply = True
             except Exception as e:  # noqa: BLE001
                 st.error(f"Analysis failed: {e}")
                 return
+        analysis = AnalysisResult.model_validate(payload)
+        analysis_key = _analysis_cache_key(model_name, mime_type, system_prompt, video_digest)
+        if invalid_reply:
+            # Keep derived caches for this empty result apart from a later good one.
+            analysis_key += ":invalid-reply"
+        # Keep the result across reruns so widgets below (e.g. the table's
+        # page selector) don't make it disappear.
+        st.session_state["analysis_result"] = (analysis_key, analysis, raw_response)
 
-        # Display cost and token usage at the top
-        usage = raw_response.get("raw", {}).get("usage", {})
-        total_tokens = usage.get("total_tokens", 0)
-        cost = usage.get("cost", 0)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Total Tokens", f"{total_tokens:,}")
-        with col2:
-            st.metric("Cost", f"${cost:.6f}")
-        
-        st.divider()
+    stored = st.session_state.get("analysis_result")
+    if stored is None:
+        return
+    analysis_key, analysis, raw_response = stored
+    segments_with_ir, segments_with_engagement, df = _segment_partitions(analysis_key, analysis)
 
-        # =================================================================
-        # SECTION 1: Global Virality Analysis
-        # =================================================================
-        st.subheader("Global Virality Analysis")
-        display_virality_metrics(analysis)
-        
-        st.divider()
-
-        # =================================================================
-        # SECTION 2: Timeline Segments Table
-        # =================================================================
-        st.subheader("Timeline Segments")
-        if analysis.timeline_segments:
-            df = build_segments_dataframe(analysis)
-            st.dataframe(
-                df,
-                use_container_width=True,
-                column_config={
-                    "is_hook": st.column_config.CheckboxColumn("Hook?", default=False),
-                    "segment_id": st.column_config.TextColumn("ID"),
-                    "start": st.column_config.TextColumn("Start"),
-                    "end": st.column_config.TextColumn("End"),
-                    "type": st.column_config.TextColumn("Type"),
-                    "shot_type": st.column_config.TextColumn("Shot"),
-                    "camera": st.column_config.TextColumn("Camera"),
-                    "tactic": st.column_config.TextColumn("Retention Tactic"),
-                    "trigger": st.column_config.TextColumn("Psych Trigger"),
-                    "ir_concept": st.column_config.TextColumn("IR Concept", width="large"),
-                },
-            )
-        else:
-            st.info("No timeline segments returned.")
-        
-        st.divider()
-
-        # =================================================================
-        # SECTION 3: Detailed Views (Expandable)
-        # =================================================================
-        tab1, tab2, tab3 = st.tabs([
-            "IR Reconstruction Prompts",
-            "Engagement Mechanics Details",
-            "Raw JSON Data",
-        ])
-        
-        with tab1:
-            st.markdown("**Generative prompts to recreate each scene:**")
-            display_ir_prompts(analysis)
-        
-        with tab2:
-            st.markdown("**Detailed engagement analysis per scene:**")
-            display_engagement_details(analysis)
-        
-        with tab3:
-            st.markdown("**Full Analysis JSON:**")
-            st.json(analysis.model_dump(), expanded=False)
-            
-            st.markdown("**Raw API Response:**")
-            st.json(raw_response, expanded=False)
+    # Display cost and token usage at the top
+    usage = raw_response.get("raw", {}).get("usage", {})
+    total_tokens = usage.get("total_tokens", 0)
+    cost = usage.get("cost", 0)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Total Tokens", f"{total_tokens:,}")
+    with col2:
+        st.metric("Cost", f"${cost:.6f}")
+
+    st.divider()
+
+    # =================================================================
+    # SECTION 1: Global Virality Analysis
+    # =================================================================
+    st.subheader("Global Virality Analysis")
+    display_virality_metrics(analysis)
+
+    st.divider()
+
+    # =================================================================
+    # SECTION 2: Timeline Segments Table
+    # =================================================================
+    st.subheader("Timeline Segments")
+    if analysis.timeline_segments:
+        display_large_dataframe(
+            df,
+            page_size=50,
+            key="segments_page",
+            use_container_width=True,
+            column_config=_segments_column_config(),
+        )
+    else:
+        st.info("No timeline segments returned.")
+
+    st.divider()
+
+    # =================================================================
+    # SECTION 3: Detailed Views (Expandable)
+    # =================================================================
+    tab1, tab2, tab3 = st.tabs([
+        "IR Reconstruction Prompts",
+        "Engagement Mechanics Details",
+        "Raw JSON Data",
+    ])
+
+    with tab1:
+        st.markdown("**Generative prompts to recreate each scene:**")
+        display_ir_prompts(segments_with_ir)
+
+    with tab2:
+        st.markdown("**Detailed engagement analysis per scene:**")
+        display_engagement_details(segments_with_engagement)
+
+    with tab3:
+        display_raw_json(analysis_key, analysis, raw_response)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,27 @@
 from __future__ import annotations
 
+import dataclasses
 from typing import List, Optional, Union
 
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    TypeAdapter,
+    ValidationError,
+    field_validator,
+    model_validator,
+)
+from pydantic.dataclasses import dataclass
 
+from model_json import strip_json_fences
 
-class TechnicalSpecs(BaseModel):
+# Small leaf models without validators are slotted pydantic dataclasses: an
+# analysis holds several of them per timeline segment, and slots drop the
+# per-instance __dict__. They validate and dump like BaseModel when nested.
+
+
+@dataclass(slots=True)
+class TechnicalSpecs:
     resolution: Optional[str] = None
     fps: Optional[float] = None
     audio_channels: Optional[int] = None
@@ -27,19 +43,48 @@ class GlobalAnalysis(BaseModel):
     dominant_language: Optional[str] = None
 
 
+def _seconds_to_time_string(seconds: Union[str, float, int]) -> str:
+    """
+    Convert seconds (float/int) to time string format "MM:SS" or "HH:MM:SS".
+    If input is already a string, return it as-is.
+    """
+    if isinstance(seconds, str):
+        return seconds
+    
+    total_seconds = int(seconds)
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    secs = total_seconds % 60
+    
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    else:
+        return f"{minutes:02d}:{secs:02d}"
+
+
 class TimeRange(BaseModel):
     start: str  # format "HH:MM:SS" or "MM:SS"
     end: str
 
+    @field_validator("start", "end", mode="before")
+    @classmethod
+    def _convert_time_to_string(cls, v: Union[str, float, int]) -> str:
+        """
+        Convert float/int seconds to time string format before validation.
+        """
+        return _seconds_to_time_string(v)
 
-class Classification(BaseModel):
+
+@dataclass(slots=True)
+class Classification:
     type: Optional[str] = None
     topic: Optional[str] = None
 
 
-class VisualSubject(BaseModel):
+@dataclass(slots=True)
+class VisualSubject:
     label: Optional[str] = None
-    attributes: List[str] = Field(default_factory=list)
+    attributes: List[str] = dataclasses.field(default_factory=list)
     action: Optional[str] = None
     emotion: Optional[str] = None
 
@@ -64,14 +109,16 @@ class TextExtractionOCR(BaseModel):
 
 
 # --- VIRALITY & ENGAGEMENT (The "Why") ---
-class EngagementMechanics(BaseModel):
+@dataclass(slots=True)
+class EngagementMechanics:
     is_hook: bool = False
     tactic: Optional[str] = None  # e.g., "Pattern Interrupt", "Fast cuts", "Text overlay pop-up"
     psychological_trigger: Optional[str] = None  # e.g., "FOMO", "Anger", "Inspiration", "Curiosity"
 
 
 # --- INTERMEDIATE REPRESENTATION (IR - Abstract) ---
-class IRReconstruction(BaseModel):
+@dataclass(slots=True)
+class IRReconstruction:
     abstract_concept: Optional[str] = None  # e.g., "Authority figure, symmetrical composition"
     generative_prompt: Optional[str] = None  # Prompt to recreate the scene with target engine
 
@@ -92,32 +139,9 @@ class GlobalViralityAnalysis(BaseModel):
         return v
 
 
-def _seconds_to_time_string(seconds: Union[str, float, int]) -> str:
-    """
-    Convert seconds (float/int) to time string format "MM:SS" or "HH:MM:SS".
-    If input is already a string, return it as-is.
-    """
-    if isinstance(seconds, str):
-        return seconds
-    
-    total_seconds = int(seconds)
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    secs = total_seconds % 60
-    
-    if hours > 0:
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-    else:
-        return f"{minutes:02d}:{secs:02d}"
-
-
 class TimelineSegment(BaseModel):
     segment_id: Optional[str] = None
     time_range: Optional[TimeRange] = None
-    # Some models may emit `start` / `end` at the top level instead of nested `time_range`.
-    # Accept both string and float/int (seconds) - validator converts to string format
-    start: Optional[str] = None
-    end: Optional[str] = None
     classification: Optional[Classification] = None
     visual_analysis: Optional[VisualAnalysis] = None
     audio_analysis: Optional[AudioAnalysis] = None
@@ -148,29 +172,27 @@ class TimelineSegment(BaseModel):
             return {"visible_text": v}
         return v
 
-    @field_validator("start", "end", mode="before")
+    @model_validator(mode="before")
     @classmethod
-    def _convert_time_to_string(cls, v: Union[str, float, int, None]) -> Optional[str]:
-        """
-        Convert float/int seconds to time string format before validation.
-        """
-        if v is None:
-            return None
-        if isinstance(v, str):
-            return v
-        return _seconds_to_time_string(v)
-
-    @model_validator(mode="after")
-    def _coerce_time_range(self) -> "TimelineSegment":
+    def _coerce_time_range(cls, data):
         """
         Allow either nested `time_range` or top-level `start`/`end` fields.
-        """
-        if self.time_range is None and self.start is not None and self.end is not None:
-            self.time_range = TimeRange(start=self.start, end=self.end)
-        return self
-
 
-class ExtractedAction(BaseModel):
+        Top-level values are folded into `time_range` before field validation,
+        so `TimeRange` converts them exactly once.
+        """
+        if (
+            isinstance(data, dict)
+            and data.get("time_range") is None
+            and data.get("start") is not None
+            and data.get("end") is not None
+        ):
+            data = {**data, "time_range": {"start": data["start"], "end": data["end"]}}
+        return data
+
+
+@dataclass(slots=True)
+class ExtractedAction:
     action: str
     timestamp: str  # format "HH:MM:SS" or "MM:SS"
 
@@ -189,6 +211,32 @@ class AnalysisResult(BaseModel):
     extracted_entities: Optional[ExtractedEntities] = None
 
 
+_ANALYSIS_ADAPTER = TypeAdapter(AnalysisResult)
+
+
+def parse_analysis_json(text: str) -> Optional[AnalysisResult]:
+    """
+    Validate raw model output straight from JSON text into AnalysisResult.
+
+    Markdown fences are stripped first. Returns None if the output is not
+    valid JSON; any other validation error is raised.
+    """
+    try:
+        return _ANALYSIS_ADAPTER.validate_json(strip_json_fences(text))
+    except ValidationError as exc:
+        if not any(err["type"] == "json_invalid" for err in exc.errors()):
+            raise
+    return None
+
+
+def validate_analysis_json(text: str) -> AnalysisResult:
+    """
+    `parse_analysis_json`, with an empty AnalysisResult for invalid JSON.
+    """
+    analysis = parse_analysis_json(text)
+    return analysis if analysis is not None else AnalysisResult()
+
+
 __all__ = [
     "TechnicalSpecs",
     "FileInfo",
@@ -206,5 +254,7 @@ __all__ = [
     "ExtractedAction",
     "ExtractedEntities",
     "AnalysisResult",
+    "parse_analysis_json",
+    "validate_analysis_json",
 ]
 
@@ -1,15 +1,30 @@
 from __future__ import annotations
 
-import json
+import functools
+import hashlib
 import os
-from typing import Any, Dict, Optional
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
 
-import google.generativeai as genai  # type: ignore[import]
-from dotenv import load_dotenv  # type: ignore[import]
+import orjson
 
-from video_analysis_models import AnalysisResult
+from model_json import strip_json_fences
+from video_analysis_models import AnalysisResult, validate_analysis_json
 from prompt_templates import build_reveng_system_prompt
 
+# google-generativeai (grpc/protobuf) and python-dotenv are imported where
+# they are first needed, so importing this module without using Gemini
+# stays cheap.
+
+# Gemini keeps uploaded files for 48h; reuse a handle for at most 24h.
+_UPLOAD_TTL_SECONDS = 24 * 3600
+# Content SHA-256 -> (upload start time, future of the uploaded file handle).
+_UPLOADED_FILES: Dict[str, Tuple[float, Future]] = {}
+# Guards `_UPLOADED_FILES` only; never held during an upload.
+_UPLOAD_LOCK = threading.Lock()
+
 
 def configure_genai(api_key: Optional[str] = None) -> None:
     """
@@ -19,6 +34,9 @@ def configure_genai(api_key: Optional[str] = None) -> None:
     - If `api_key` is not provided, attempts to read it from `GEMINI_API_KEY`
       or `GOOGLE_API_KEY`.
     """
+    import google.generativeai as genai  # type: ignore[import]
+    from dotenv import load_dotenv  # type: ignore[import]
+
     # Load from .env so local development can just define keys there.
     load_dotenv()
 
@@ -31,25 +49,79 @@ def configure_genai(api_key: Optional[str] = None) -> None:
     genai.configure(api_key=effective_key)
 
 
+@functools.lru_cache(maxsize=8)
+def _get_genai_model(model_name: str) -> Any:
+    """
+    Return a shared `genai.GenerativeModel` for `model_name`.
+
+    Call `configure_genai()` first; the model picks up the global client
+    configuration when it is constructed.
+    """
+    import google.generativeai as genai  # type: ignore[import]
+
+    return genai.GenerativeModel(model_name)
+
+
+def _sha256_of_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hex SHA-256 of a file's contents, read in `chunk_size` pieces.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _upload_file_cached(video_file_path: str) -> Any:
+    """
+    `genai.upload_file`, reusing the handle of an earlier upload of the same content.
+
+    Concurrent calls for one video (e.g. `main.demo`'s two parallel requests)
+    share a single upload by waiting on its future; different videos upload
+    in parallel. Expired entries are evicted whenever a new upload starts,
+    and a failed upload is forgotten so the next call retries it.
+    """
+    import google.generativeai as genai  # type: ignore[import]
+
+    content_sha256 = _sha256_of_file(video_file_path)
+    with _UPLOAD_LOCK:
+        now = time.monotonic()
+        entry = _UPLOADED_FILES.get(content_sha256)
+        if entry is not None and now - entry[0] < _UPLOAD_TTL_SECONDS:
+            pending = entry[1]
+            owner = False
+        else:
+            for digest in [
+                d for d, (started, _) in _UPLOADED_FILES.items()
+                if now - started >= _UPLOAD_TTL_SECONDS
+            ]:
+                del _UPLOADED_FILES[digest]
+            pending = Future()
+            _UPLOADED_FILES[content_sha256] = (now, pending)
+            owner = True
+
+    if owner:
+        try:
+            pending.set_result(genai.upload_file(path=video_file_path))
+        except BaseException as exc:
+            with _UPLOAD_LOCK:
+                if _UPLOADED_FILES.get(content_sha256, (0.0, None))[1] is pending:
+                    del _UPLOADED_FILES[content_sha256]
+            pending.set_exception(exc)
+            raise
+    return pending.result()
+
+
 def _parse_json_safe(text: str) -> Dict[str, Any]:
     """
     Best-effort JSON parsing helper with simple cleanup for common artifacts.
     """
-    text = text.strip()
-
-    # Remove leading markdown fences if the model still produces them.
-    if text.startswith("```"):
-        # Strip first fence
-        first_fence_end = text.find("\n")
-        if first_fence_end != -1:
-            text = text[first_fence_end + 1 :]
-        # Strip possible trailing fence
-        if text.rstrip().endswith("```"):
-            text = text.rstrip()[:-3]
+    text = strip_json_fences(text)
 
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
         return {"error": "Invalid JSON output", "raw": text}
 
 
@@ -63,18 +135,17 @@ def analyze_video_structure(
 
     The `system_prompt` should instruct the model to emit JSON matching `AnalysisResult`.
     """
-    model = genai.GenerativeModel(model_name)
+    model = _get_genai_model(model_name)
 
-    video_file = genai.upload_file(path=video_file_path)
+    video_file = _upload_file_cached(video_file_path)
 
     response = model.generate_content(
         [system_prompt, video_file],
         generation_config={"response_mime_type": "application/json"},
     )
 
-    payload = _parse_json_safe(getattr(response, "text", "") or "")
-    # Let Pydantic validate/normalize into our schema.
-    return AnalysisResult.model_validate(payload)
+    # Let Pydantic validate/normalize straight from the JSON text.
+    return validate_analysis_json(getattr(response, "text", "") or "")
 
 
 def reverse_engineer_scenes(
@@ -94,8 +165,8 @@ def reverse_engineer_scenes(
         subtitle_context=subtitle_data or "",
     )
 
-    model = genai.GenerativeModel(model_name)
-    video_file = genai.upload_file(path=video_file_path)
+    model = _get_genai_model(model_name)
+    video_file = _upload_file_cached(video_file_path)
 
     response = model.generate_content(
         [system_prompt, video_file],
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from analysis_cache import hash_bytes
+
+
+DEFAULT_FRAME_CACHE_DIR = ".frame_cache"
+
+
+def _frame_cache_path(
+    path: str,
+    fps: float,
+    max_frames: int,
+    max_side: int,
+    cache_dir: str,
+) -> str:
+    """
+    Cache file for a source video + sampling params.
+
+    The source's size and mtime are part of the key so an edited file is resampled.
+    """
+    stat = os.stat(path)
+    key_src = "|".join(
+        str(part)
+        for part in (
+            os.path.abspath(path),
+            stat.st_size,
+            stat.st_mtime_ns,
+            fps,
+            max_frames,
+            max_side,
+        )
+    )
+    return os.path.join(cache_dir, f"{hash_bytes(key_src.encode('utf-8'))}.mp4")
+
+
+def _count_frames(cv2: Any, path: str) -> int:
+    """
+    Count frames by grabbing through the whole video (for containers that
+    don't report `CAP_PROP_FRAME_COUNT`). Returns 0 if it can't be opened.
+    """
+    cap = cv2.VideoCapture(path)
+    count = 0
+    try:
+        while cap.grab():
+            count += 1
+    finally:
+        cap.release()
+    return count
+
+
+def preprocess_video_file(
+    path: str,
+    fps: float = 2.0,
+    max_frames: int = 64,
+    max_side: int = 720,
+    cache_dir: str = DEFAULT_FRAME_CACHE_DIR,
+) -> str:
+    """
+    Resample a video to at most `fps` / `max_frames`, downscaled so its longest
+    side is <= `max_side`, and return the path of the cached MP4.
+
+    Frames are spread uniformly over the whole video when `fps` would exceed
+    `max_frames`, and the output frame rate is chosen so timestamps still match
+    the source. The output has no audio track. If the container does not
+    report a frame count, the frames are counted in an extra decode pass first
+    so sampling still covers the whole video rather than just its start.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Video file not found: {path}")
+
+    out_path = _frame_cache_path(path, fps, max_frames, max_side, cache_dir)
+    if os.path.exists(out_path):
+        return out_path
+
+    import cv2  # type: ignore[import]
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {path}")
+
+    src_fps = cap.get(cv2.CAP_PROP_FPS) or fps
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    if total_frames <= 0:
+        total_frames = _count_frames(cv2, path)
+    step = max(src_fps / fps, 1.0)
+    if total_frames > 0:
+        step = max(step, total_frames / max_frames)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Keep the .mp4 suffix so OpenCV picks the right container.
+    tmp_path = f"{out_path[:-4]}.tmp.mp4"
+    writer = None
+    written = 0
+    index = 0
+    next_pick = 0.0
+    try:
+        # Sequential grab() + selective retrieve(): only sampled frames are
+        # decoded, and there is no per-frame seek via CAP_PROP_POS_FRAMES.
+        while written < max_frames and cap.grab():
+            if index >= next_pick:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                height, width = frame.shape[:2]
+                scale = max_side / max(height, width)
+                if scale < 1.0:
+                    frame = cv2.resize(
+                        frame,
+                        (int(width * scale), int(height * scale)),
+                        interpolation=cv2.INTER_AREA,
+                    )
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(
+                        tmp_path,
+                        cv2.VideoWriter.fourcc(*"mp4v"),
+                        src_fps / step,
+                        (width, height),
+                    )
+                    if not writer.isOpened():
+                        raise RuntimeError(
+                            f"Could not open an mp4v VideoWriter for {tmp_path}; "
+                            "this OpenCV build may lack an MP4 encoder."
+                        )
+                writer.write(frame)
+                written += 1
+                next_pick += step
+            index += 1
+    finally:
+        cap.release()
+        if writer is not None:
+            writer.release()
+
+    if written == 0:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise RuntimeError(f"No frames could be decoded from: {path}")
+
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def preprocess_video(
+    path: str,
+    fps: float = 2.0,
+    max_frames: int = 64,
+    max_side: int = 720,
+    cache_dir: str = DEFAULT_FRAME_CACHE_DIR,
+) -> bytes:
+    """
+    Same as `preprocess_video_file`, but returns the resampled MP4 bytes.
+    """
+    out_path = preprocess_video_file(
+        path,
+        fps=fps,
+        max_frames=max_frames,
+        max_side=max_side,
+        cache_dir=cache_dir,
+    )
+    with open(out_path, "rb") as f:
+        return f.read()
+
+
+__all__ = [
+    "DEFAULT_FRAME_CACHE_DIR",
+    "preprocess_video_file",
+    "preprocess_video",
+]